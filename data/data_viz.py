@@ -13,78 +13,93 @@ RUN_JSON = "A:\My Stuff\Projects\Python Stuff\Realtime Grammar Inferesing\gramma
 # (Note: this is a reported value from the ICSE'24 TreeVada paper, not your local run.)
 TREEVADA_WHILE_WALL_SECONDS_REPORTED = 16.0
 
+SYSTEMS = ["This work", "TreeVada \npaper-reported\nseed-dependent"]
+
 # -----------------------------
-# Load your run JSON
+# Load a run JSON
 # -----------------------------
-p = Path(RUN_JSON)
-if not p.exists():
-    raise FileNotFoundError(f"Could not find {RUN_JSON} in the current folder.")
+def load_run(path):
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Could not find {path} in the current folder.")
 
-with p.open("r", encoding="utf-8") as f:
-    data = json.load(f)
+    with p.open("r", encoding="utf-8") as f:
+        data = json.load(f)
 
-bench = data.get("bench", {}) or {}
-pm = data.get("power_metrics", {}) or {}
+    bench = data.get("bench", {}) or {}
+    pm = data.get("power_metrics", {}) or {}
 
-# Prefer power_metrics.wall_seconds if present; otherwise fall back to bench.wall_ms
-this_wall_s = pm.get("wall_seconds", None)
-if this_wall_s is None:
-    this_wall_s = float(bench.get("wall_ms", 0.0)) / 1000.0
-else:
-    this_wall_s = float(this_wall_s)
+    # Prefer power_metrics.wall_seconds if present; otherwise fall back to bench.wall_ms
+    this_wall_s = pm.get("wall_seconds", None)
+    if this_wall_s is None:
+        this_wall_s = float(bench.get("wall_ms", 0.0)) / 1000.0
+    else:
+        this_wall_s = float(this_wall_s)
 
-files_used = int(bench.get("files_used", 0) or 0)
+    files_used = int(bench.get("files_used", 0) or 0)
+    return {"wall_seconds": this_wall_s, "files_used": files_used}
 
 # -----------------------------
-# Data for plot
+# Figure setup — once per dashboard, not once per update
 # -----------------------------
-systems = ["This work", "TreeVada \npaper-reported\nseed-dependent"]
-wall_times = [this_wall_s, TREEVADA_WHILE_WALL_SECONDS_REPORTED]
+def make_axes():
+    fig, ax = plt.subplots(figsize=(7, 3.6))
 
-x = np.arange(len(systems))
+    x = np.arange(len(SYSTEMS))
+    bar_width = 0.28  # narrower bars
+    bars = ax.bar(x, [0.0] * len(SYSTEMS), width=bar_width)
 
-# -----------------------------
-# Figure
-# -----------------------------
-fig, ax = plt.subplots(figsize=(7, 3.6))
+    # Visually mark TreeVada as "reported" (not measured in your environment)
+    bars[1].set_hatch("//")
+    bars[1].set_edgecolor("black")
+    bars[1].set_linewidth(1.0)
 
-bar_width = 0.28  # narrower bars
-bars = ax.bar(x, wall_times, width=bar_width)
+    ax.set_ylabel("Wall time (seconds)")
+    ax.set_xticks(x)
+    ax.set_xticklabels(SYSTEMS)
 
-# Visually mark TreeVada as "reported" (not measured in your environment)
-bars[1].set_hatch("//")
-bars[1].set_edgecolor("black")
-bars[1].set_linewidth(1.0)
+    return fig, ax, bars
 
 # -----------------------------
-# Labels & title (linear axis)
+# Per-update redraw: mutate the persistent artists in place so a live
+# dashboard doesn't allocate a fresh Figure/Axes/Bars every refresh
+# (matplotlib keeps figures alive unless they are explicitly closed)
 # -----------------------------
-ax.set_ylabel("Wall time (seconds)")
-if files_used > 0:
-    ax.set_title(f"Grammar inference on WHILE benchmark ({files_used} programs)")
-else:
-    ax.set_title("Grammar inference on WHILE benchmark")
-
-ax.set_xticks(x)
-ax.set_xticklabels(systems)
-
-# Linear axis + sensible headroom
-ymax = max(wall_times) if max(wall_times) > 0 else 1.0
-ax.set_ylim(0, ymax * 1.15)
-
-# -----------------------------
-# Annotations
-# -----------------------------
-for i, (b, t) in enumerate(zip(bars, wall_times)):
-    label = f"{t:.3f}s" if t < 10 else f"{t:.0f}s"
-    ax.text(
-        b.get_x() + b.get_width() / 2,
-        b.get_height(),
-        label,
-        ha="center",
-        va="bottom",
-        fontsize=10,
+def update_bars(ax, bars, wall_times, files_used=0):
+    for b, t in zip(bars, wall_times):
+        b.set_height(t)
+
+    if files_used > 0:
+        ax.set_title(f"Grammar inference on WHILE benchmark ({files_used} programs)")
+    else:
+        ax.set_title("Grammar inference on WHILE benchmark")
+
+    # Linear axis + sensible headroom
+    ymax = max(wall_times) if max(wall_times) > 0 else 1.0
+    ax.set_ylim(0, ymax * 1.15)
+
+    # Annotations: drop the stale labels, re-draw against the new heights
+    for txt in list(ax.texts):
+        txt.remove()
+    for b, t in zip(bars, wall_times):
+        label = f"{t:.3f}s" if t < 10 else f"{t:.0f}s"
+        ax.text(
+            b.get_x() + b.get_width() / 2,
+            b.get_height(),
+            label,
+            ha="center",
+            va="bottom",
+            fontsize=10,
+        )
+
+if __name__ == "__main__":
+    run = load_run(RUN_JSON)
+    fig, ax, bars = make_axes()
+    update_bars(
+        ax,
+        bars,
+        [run["wall_seconds"], TREEVADA_WHILE_WALL_SECONDS_REPORTED],
+        run["files_used"],
     )
-
-plt.tight_layout()
-plt.show()
+    plt.tight_layout()
+    plt.show()
@@ -1,5 +1,17 @@
-import sys, json, re
+import sys, json, re, struct
 from collections import Counter, defaultdict
+from functools import lru_cache
+
+try:
+    # Optional: native JSON codec. The whole corpus rides in every
+    # payload, so parse/serialize sit on the request path.
+    import orjson as _orjson
+    loads = _orjson.loads
+    def dumps(obj):
+        return _orjson.dumps(obj).decode()
+except ImportError:
+    loads = json.loads
+    dumps = json.dumps
 
 IDENT_RE = r"[A-Za-z_][A-Za-z0-9_]*"
 NUM_RE   = r"(?:0|[1-9][0-9]*)"
@@ -10,56 +22,231 @@ OPS      = [
 ]
 PUNCT    = list("(){}[];,.:?")
 
-TOKEN_RE = re.compile(
-    f"{STR_RE}|{IDENT_RE}|{NUM_RE}|" +
-    "|".join(re.escape(op) for op in sorted(OPS, key=len, reverse=True)) +
-    "|[" + re.escape("".join(PUNCT)) + "]"
+# Operator alternation, prefix-factored by hand so the regex engine can
+# reject most branches on the first character instead of trying ~30 flat
+# literals in sequence. Covers exactly the OPS list above; two-char forms
+# that are not "X=" come first so maximal munch still wins ('--' before '-').
+OP_RE = r"<<|>>|&&|\|\||\+\+|--|->|::|[<>=!+*/%-]=?|[&|^~]"
+
+try:
+    # Optional: RE2 scans in linear time (DFA) where stdlib re backtracks,
+    # which matters on string-heavy corpora. Probe that the wrapper
+    # supports the named-group introspection the tokenizer relies on
+    # before trusting it; otherwise stay on stdlib re.
+    import re2 as _re2
+    _regex = _re2 if _re2.compile("(?P<A>a)").match("a").lastgroup == "A" else re
+except (ImportError, AttributeError):
+    _regex = re
+
+# Named groups let the scanner classify each token via m.lastgroup,
+# so downstream code never has to re-match token text.
+TOKEN_RE = _regex.compile(
+    f"(?P<STR>{STR_RE})"
+    f"|(?P<ID>{IDENT_RE})"
+    f"|(?P<NUM>{NUM_RE})"
+    f"|(?P<OP>{OP_RE})"
+    "|(?P<PUNCT>[" + re.escape("".join(PUNCT)) + "])"
 )
 
+# Fixed small operator universe: track presence as one int bitmask
+# instead of hashing operator strings into a Counter.
+OP_INDEX = {op: i for i, op in enumerate(OPS)}
+
+OPS_SET   = frozenset(OPS)
+PUNCT_SET = frozenset(PUNCT)
+
 KEYWORDS = {
     "if","else","while","for","return","switch","case","break","continue",
     "def","class","try","except","finally","with","lambda","func","var","let","const"
 }
 
+try:
+    # Optional native DFA scanner; build with `cythonize -i
+    # python/infer_tokenize.pyx`. Emits the same (text, class) stream as
+    # the regex path in tokenize() below.
+    from infer_tokenize import tokenize_fast as _tokenize_fast
+except ImportError:
+    _tokenize_fast = None
+
 def tokenize(text: str):
-    return TOKEN_RE.findall(text), [m.group(0) for m in TOKEN_RE.finditer(text)]
+    # Single scan over the corpus; each token carries its class tag.
+    # Keywords are split off from plain identifiers right here so that
+    # nothing downstream has to consult KEYWORDS again.
+    if _tokenize_fast is not None:
+        return _tokenize_fast(text, KEYWORDS)
+    toks = []
+    for m in TOKEN_RE.finditer(text):
+        tok, cls = m.group(0), m.lastgroup
+        if cls == "ID" and tok in KEYWORDS:
+            cls = "KW"
+        toks.append((tok, cls))
+    return toks
+
+# Fixed productions hoisted out of the emitter; the realtime loop should
+# not rebuild identical strings on every refresh.
+_CODEY_HEADER = (
+    "Program -> StmtList",
+    "StmtList -> Stmt ';' StmtList | Stmt | ε",
+)
+_FOR_LINES = (
+    "For -> 'for' '(' OptAssign ';' OptExpr ';' OptAssign ')' Stmt",
+    "OptAssign -> Assign | ε",
+    "OptExpr -> Expr | ε",
+)
+_PROSE_HEADER = (
+    "Program -> S",
+    "S -> NP VP",
+    "NP -> Det N",
+    "VP -> V NP | V",
+    "Det -> 'the' | 'a'",
+)
+_TERMINAL_LINES = (
+    "ID -> /[A-Za-z_][A-Za-z0-9_]*/",
+    "NUM -> /(?:0|[1-9][0-9]*)/",
+    "STR -> /\"([^\"\\\\]|\\\\.)*\"|'([^'\\\\]|\\\\.)*'/",
+)
 
-def build_grammar(tokens):
-    # Flatten regex capture tuples from STR_RE; keep raw token list
-    toks = tokens
+@lru_cache(maxsize=256)
+def alts(xs):
+    # Keyed on the ops tuple; the same small tier sets recur constantly.
+    # Bounded because prose summaries feed corpus-derived noun/verb
+    # tuples through here, which must not accumulate for the life of a
+    # --serve process.
+    return " | ".join(f"'{x}'" for x in xs) if xs else "ε"
 
-    # Inventories
-    idents   = [t for t in toks if re.fullmatch(IDENT_RE, t) and t not in KEYWORDS]
-    numbers  = [t for t in toks if re.fullmatch(NUM_RE, t)]
-    strings  = [t for t in toks if re.fullmatch(STR_RE, t)]
-    ops      = [t for t in toks if t in OPS]
-    punct    = [t for t in toks if t in PUNCT]
-    kws      = sorted(set(t for t in toks if t in KEYWORDS))
+def classify(tok):
+    """Class tag for a single bare token, without touching the regex
+    engine: frozenset membership for ops/punct and the C-implemented
+    str.isidentifier/isdigit for the IDENT_RE/NUM_RE shapes."""
+    if tok in OPS_SET:
+        return "OP"
+    if tok in PUNCT_SET:
+        return "PUNCT"
+    if tok.isidentifier():
+        return "KW" if tok in KEYWORDS else "ID"
+    if tok.isdigit() and (tok == "0" or tok[0] != "0"):
+        return "NUM"
+    if tok[:1] in ('"', "'"):
+        return "STR"
+    return None
 
-    op_counts = Counter(ops)
+def tokenize_spans(text: str):
+    """Columnar scan: (start, end, class) triples, with no token strings
+    allocated. Pair with summarize(spans, text=...) which slices the
+    corpus only for the classes whose identity matters."""
+    return [(m.start(), m.end(), m.lastgroup) for m in TOKEN_RE.finditer(text)]
 
-    # Decide “codey” by structure, not just presence of '(' etc.
-    codey = any(x in toks for x in (";", "{", "}", "=", "if", "while", "for")) or len(op_counts) >= 2
+def summarize(tokens, text=None):
+    """Reduce a classified token stream to the hashable tuple the grammar
+    actually depends on: codey flag, keyword set, observed operator tiers,
+    and (for prose) the top identifiers. Two corpora with equal summaries
+    produce byte-identical grammars.
+
+    `tokens` may be (text, class) pairs, bare strings, or — when `text`
+    is given — (start, end, class) spans from tokenize_spans()."""
+    # Callers that predate the tagged tokenizer may still hand us bare
+    # strings; classify them up front so the hot loops stay branch-free.
+    if text is None and tokens and type(tokens[0]) is str:
+        tokens = [(t, classify(t)) for t in tokens]
+    span_mode = text is not None
+
+    # Pass 1 — decide “codey” by structure, with an early exit on the
+    # first piece of evidence (a structural punct, '=', a control-flow
+    # keyword, or a second distinct operator). Keywords and operator
+    # presence are accumulated along the way since both branches and the
+    # metrics want them; identifier text is not touched yet.
+    kw_seen = set()
+    seen_ops_mask = 0
+    codey = False
+    rest = len(tokens)
+    for i, item in enumerate(tokens):
+        if span_mode:
+            s, e, cls = item
+            tok = None
+        else:
+            tok, cls = item
+        if cls == "OP":
+            if span_mode:
+                tok = text[s:e]
+            seen_ops_mask |= 1 << OP_INDEX[tok]
+            if tok == "=" or seen_ops_mask.bit_count() >= 2:
+                codey = True
+        elif cls == "PUNCT":
+            if span_mode:
+                tok = text[s:e]
+            if tok in (";", "{", "}"):
+                codey = True
+        elif cls == "KW" or (span_mode and cls == "ID"):
+            if span_mode:
+                tok = text[s:e]
+                if tok not in KEYWORDS:
+                    continue
+            kw_seen.add(tok)
+            if tok in ("if", "while", "for"):
+                codey = True
+        if codey:
+            rest = i + 1
+            break
+
+    if codey:
+        # Code branch: only keywords and operator presence still matter;
+        # punct, idents, numbers and strings are skipped outright.
+        for item in tokens[rest:]:
+            if span_mode:
+                s, e, cls = item
+                if cls == "OP":
+                    seen_ops_mask |= 1 << OP_INDEX[text[s:e]]
+                elif cls == "ID":
+                    tok = text[s:e]
+                    if tok in KEYWORDS:
+                        kw_seen.add(tok)
+            else:
+                tok, cls = item
+                if cls == "OP":
+                    seen_ops_mask |= 1 << OP_INDEX[tok]
+                elif cls == "KW":
+                    kw_seen.add(tok)
+        idents = []
+    else:
+        # Prose branch: pass 1 already saw the whole stream, so only the
+        # identifier vocabulary for the NP/VP grammar is still missing.
+        if span_mode:
+            idents = [tok for s, e, cls in tokens if cls == "ID"
+                      and (tok := text[s:e]) not in KEYWORDS]
+        else:
+            idents = [tok for tok, cls in tokens if cls == "ID"]
+    kws = tuple(sorted(kw_seen))
+
+    def seen(op):
+        return seen_ops_mask & (1 << OP_INDEX[op])
 
     # Operator productions based on *observed* operators
-    add_ops = [op for op in ["+","-"] if op in op_counts]
-    mul_ops = [op for op in ["*","/","%"] if op in op_counts]
-    rel_ops = [op for op in ["<",">","<=",">=","==","!="] if op in op_counts]
-    bit_ops = [op for op in ["&","|","^","<<",">>"] if op in op_counts]
-    assign_ops = [op for op in ["=","+=","-=","*=","/=","%="] if op in op_counts]
+    add_ops = tuple(op for op in ["+","-"] if seen(op))
+    mul_ops = tuple(op for op in ["*","/","%"] if seen(op))
+    rel_ops = tuple(op for op in ["<",">","<=",">=","==","!="] if seen(op))
+    bit_ops = tuple(op for op in ["&","|","^","<<",">>"] if seen(op))
+    assign_ops = tuple(op for op in ["=","+=","-=","*=","/=","%="] if seen(op))
+
+    # Top identifiers only feed the prose (NP/VP) grammar; keep them out
+    # of codey summaries so cache keys don't churn on variable renames.
+    top_ids = () if codey else tuple(w for w, _ in Counter(idents).most_common(8))
+
+    # Everything observed, for metrics; kept out of the emission key so
+    # ops that no production uses don't defeat the grammar cache.
+    obs_ops = tuple(op for op in sorted(OPS) if seen(op))
+
+    return (codey, kws, add_ops, mul_ops, rel_ops, bit_ops, assign_ops, top_ids), obs_ops
 
-    def alts(xs): 
-        return " | ".join(f"'{x}'" for x in xs) if xs else "ε"
+@lru_cache(maxsize=256)
+def grammar_from_summary(summary):
+    codey, kws, add_ops, mul_ops, rel_ops, bit_ops, assign_ops, top_ids = summary
 
     # Non-terminals assembled dynamically
     lines = []
     lines.append("start: Program;")
 
     if codey:
-        lines += [
-            "Program -> StmtList",
-            "StmtList -> Stmt ';' StmtList | Stmt | ε",
-        ]
+        lines += _CODEY_HEADER
 
         # Statement forms inferred by keywords seen
         stmt_alts = ["Assign", "Expr"]
@@ -87,9 +274,7 @@ def build_grammar(tokens):
             lines.append("While -> 'while' '(' Expr ')' Stmt")
 
         if "for" in kws:
-            lines.append("For -> 'for' '(' OptAssign ';' OptExpr ';' OptAssign ')' Stmt")
-            lines.append("OptAssign -> Assign | ε")
-            lines.append("OptExpr -> Expr | ε")
+            lines += _FOR_LINES
 
         # Expression with operator tiers *present in the file*
         tier = []
@@ -100,7 +285,7 @@ def build_grammar(tokens):
 
         # Fall back tiers if none observed
         if not tier:
-            tier = [("AddExpr", ["+","-"]), ("MulExpr", ["*","/"])]
+            tier = [("AddExpr", ("+","-")), ("MulExpr", ("*","/"))]
 
         # Build tiers
         prev = "Factor"
@@ -116,46 +301,74 @@ def build_grammar(tokens):
     else:
         # Simple NP/VP that adapts vocabulary
         # Use some most-common idents as nouns/verbs
-        id_freq = Counter(idents)
-        ids_sorted = [w for w,_ in id_freq.most_common(8)]
-        nouns = ids_sorted[:4] or ["thing","idea"]
-        verbs = ids_sorted[4:8] or ["do","make"]
-        lines += [
-            "Program -> S",
-            "S -> NP VP",
-            "NP -> Det N",
-            "VP -> V NP | V",
-            "Det -> 'the' | 'a'",
-            "N -> " + " | ".join(f"'{n}'" for n in nouns),
-            "V -> " + " | ".join(f"'{v}'" for v in verbs),
-        ]
+        nouns = top_ids[:4] or ("thing","idea")
+        verbs = top_ids[4:8] or ("do","make")
+        lines += _PROSE_HEADER
+        lines.append("N -> " + alts(nouns))
+        lines.append("V -> " + alts(verbs))
 
     # Assemble terminals (ID/NUM/STR)
-    lines.append("ID -> /[A-Za-z_][A-Za-z0-9_]*/")
-    lines.append("NUM -> /(?:0|[1-9][0-9]*)/")
-    lines.append("STR -> /\"([^\"\\\\]|\\\\.)*\"|'([^'\\\\]|\\\\.)*'/")
+    lines += _TERMINAL_LINES
 
     return ";\n".join(lines) + ";"
 
-def main():
+def build_grammar(tokens, text=None):
+    """Return (grammar, observed_ops, observed_kws). The sets fall out of
+    summarize's single pass, so metrics never rescan the token stream.
+    Pass `text` when `tokens` are spans from tokenize_spans()."""
+    # Realtime callers re-infer on every edit; most edits don't change the
+    # summary, so the emission step is usually a cache hit.
+    summary, obs_ops = summarize(tokens, text)
+    return grammar_from_summary(summary), obs_ops, summary[1]
+
+def handle_payload(payload):
+    # `payload` may be str or bytes; both codecs take either.
     try:
-        payload = sys.stdin.read()
-        data = json.loads(payload or "{}")
+        data = loads(payload) if payload else {}
         corpus = data.get("corpus", "")
         # Tokenize
-        _, toks = tokenize(corpus)
-        grammar = build_grammar(toks)
-        out = {
+        if _tokenize_fast is not None:
+            # Native scanner: already materializes (text, class) pairs
+            toks = _tokenize_fast(corpus, KEYWORDS)
+            grammar, obs_ops, obs_kws = build_grammar(toks)
+        else:
+            # Regex scanner: keep spans only, slice on demand
+            toks = tokenize_spans(corpus)
+            grammar, obs_ops, obs_kws = build_grammar(toks, corpus)
+        return {
             "grammar": grammar,
             "metrics": {
                 "num_tokens": len(toks),
-                "unique_ops": sorted(list(set(t for t in toks if t in OPS))),
-                "has_keywords": sorted(list(set(t for t in toks if t in KEYWORDS))),
+                "unique_ops": list(obs_ops),
+                "has_keywords": list(obs_kws),
             }
         }
-        sys.stdout.write(json.dumps(out))
     except Exception as e:
-        sys.stdout.write(json.dumps({"error": str(e)}))
+        return {"error": str(e)}
+
+def serve():
+    # Long-lived mode: the caller pipes length-prefixed JSON requests into
+    # one warm process, amortizing interpreter startup and TOKEN_RE
+    # compilation across the whole run instead of paying them per file.
+    # Framing is a big-endian uint32 byte length followed by the payload,
+    # in both directions.
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    while True:
+        header = stdin.read(4)
+        if len(header) < 4:
+            break  # clean EOF from the caller
+        (n,) = struct.unpack(">I", header)
+        payload = stdin.read(n)
+        resp = dumps(handle_payload(payload)).encode("utf-8")
+        stdout.write(struct.pack(">I", len(resp)))
+        stdout.write(resp)
+        stdout.flush()
+
+def main():
+    if "--serve" in sys.argv[1:]:
+        serve()
+    else:
+        sys.stdout.write(dumps(handle_payload(sys.stdin.buffer.read())))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
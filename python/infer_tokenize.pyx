@@ -0,0 +1,130 @@
+# cython: language_level=3
+# cython: boundscheck=False, wraparound=False
+"""Native DFA tokenizer mirroring infer_backend's regex scanner.
+
+Optional acceleration: build in place with
+
+    cythonize -i python/infer_tokenize.pyx
+
+infer_backend imports this opportunistically and falls back to its
+pure-Python regex scanner when the extension has not been built. The
+token stream must stay identical to that scanner: (text, class) pairs
+with classes STR/ID/KW/NUM/OP/PUNCT, maximal-munch operators, NUM
+matching 0|[1-9][0-9]*, and unmatched characters (including an
+unterminated quote) skipped.
+"""
+
+cpdef list tokenize_fast(unicode s, object keywords):
+    """Tokenize `s`, tagging identifiers found in `keywords` as KW."""
+    cdef Py_ssize_t i = 0, j, n = len(s)
+    cdef Py_UCS4 ch, q, c2
+    cdef unicode tok
+    cdef list out = []
+    while i < n:
+        ch = s[i]
+
+        # identifiers / keywords: [A-Za-z_][A-Za-z0-9_]*
+        if (u'A' <= ch <= u'Z') or (u'a' <= ch <= u'z') or ch == u'_':
+            j = i + 1
+            while j < n:
+                ch = s[j]
+                if ((u'A' <= ch <= u'Z') or (u'a' <= ch <= u'z')
+                        or (u'0' <= ch <= u'9') or ch == u'_'):
+                    j += 1
+                else:
+                    break
+            tok = s[i:j]
+            out.append((tok, u"KW" if tok in keywords else u"ID"))
+            i = j
+            continue
+
+        # numbers: 0 | [1-9][0-9]*  (a leading zero is its own token)
+        if u'0' <= ch <= u'9':
+            if ch == u'0':
+                out.append((u"0", u"NUM"))
+                i += 1
+                continue
+            j = i + 1
+            while j < n and u'0' <= s[j] <= u'9':
+                j += 1
+            out.append((s[i:j], u"NUM"))
+            i = j
+            continue
+
+        # strings with backslash escapes; like the regex scanner, an
+        # escape cannot hide a newline and an unterminated quote is
+        # dropped so scanning resumes right after it
+        if ch == u'"' or ch == u"'":
+            q = ch
+            j = i + 1
+            while j < n:
+                ch = s[j]
+                if ch == q:
+                    break
+                if ch == u'\\':
+                    if j + 1 < n and s[j + 1] != u'\n':
+                        j += 2
+                    else:
+                        j = n
+                else:
+                    j += 1
+            if j < n:
+                out.append((s[i:j + 1], u"STR"))
+                i = j + 1
+            else:
+                i += 1
+            continue
+
+        # operators, longest match first
+        c2 = s[i + 1] if i + 1 < n else u'\0'
+        tok = None
+        if ch == u'<':
+            tok = u"<<" if c2 == u'<' else (u"<=" if c2 == u'=' else u"<")
+        elif ch == u'>':
+            tok = u">>" if c2 == u'>' else (u">=" if c2 == u'=' else u">")
+        elif ch == u'=':
+            tok = u"==" if c2 == u'=' else u"="
+        elif ch == u'!':
+            tok = u"!=" if c2 == u'=' else u"!"
+        elif ch == u'&':
+            tok = u"&&" if c2 == u'&' else u"&"
+        elif ch == u'|':
+            tok = u"||" if c2 == u'|' else u"|"
+        elif ch == u'+':
+            tok = u"++" if c2 == u'+' else (u"+=" if c2 == u'=' else u"+")
+        elif ch == u'-':
+            if c2 == u'-':
+                tok = u"--"
+            elif c2 == u'>':
+                tok = u"->"
+            else:
+                tok = u"-=" if c2 == u'=' else u"-"
+        elif ch == u'*':
+            tok = u"*=" if c2 == u'=' else u"*"
+        elif ch == u'/':
+            tok = u"/=" if c2 == u'=' else u"/"
+        elif ch == u'%':
+            tok = u"%=" if c2 == u'=' else u"%"
+        elif ch == u'^' or ch == u'~':
+            tok = s[i:i + 1]
+        elif ch == u':':
+            if c2 == u':':
+                tok = u"::"
+            else:
+                out.append((u":", u"PUNCT"))
+                i += 1
+                continue
+        if tok is not None:
+            out.append((tok, u"OP"))
+            i += len(tok)
+            continue
+
+        # punctuation
+        if ch in u"(){}[];,.?":
+            out.append((s[i:i + 1], u"PUNCT"))
+            i += 1
+            continue
+
+        # whitespace / anything the grammar doesn't model
+        i += 1
+    return out